@@ -12,15 +12,18 @@ import argparse
 import math
 import os
 import random
+import re
 import string
 import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
-import matplotlib.pyplot as plt
+from typing import Dict, List, Optional, Tuple
 
 # --- Type Aliases for Clarity ---
 Point = Tuple[float, float]
 Layout = Dict[str, Point]
+Bigrams = Dict[Tuple[str, str], int]
 
 # --- Keyboard layout utility functions ---
 
@@ -61,36 +64,91 @@ def preprocess_text(text: str, chars: str) -> str:
     Lowercase and filter the text to the allowed character set,
     mapping all other characters to space.
     """
-    out = ""
-    for i in text.lower():
-        out += i if i in chars else " "
-    return out
+    text = text.lower()
+    if not chars:
+        # "[^]" is not a valid pattern; nothing is allowed anyway
+        return " " * len(text)
+    disallowed = re.compile(f"[^{re.escape(chars)}]")
+    return disallowed.sub(" ", text)
+
+def bigram_counts(text: str) -> Bigrams:
+    """
+    Count every adjacent character pair (bigram) in the text.
+    """
+    return Counter(zip(text, text[1:]))
 
-def path_length_cost(text: str, layout: Layout) -> float:
+def distance(p: Point, q: Point) -> float:
     """
-    Calculate total Euclidean distance traveled to type the given text using the layout.
+    Euclidean distance between two key positions.
+    """
+    return math.hypot(q[0] - p[0], q[1] - p[1])
+
+def bigram_cost(bigrams: Bigrams, layout: Layout) -> float:
+    """
+    Total distance traveled for the given bigram counts, one term per distinct pair.
     """
     cost = 0.0
-    if not text:
-        return 0.0
-    prev = layout[text[0]]
-    for ch in text[1:]:
-        curr = layout[ch]
-        dx = curr[0] - prev[0]
-        dy = curr[1] - prev[1]
-        cost += (dx ** 2 + dy ** 2) ** 0.5
-        prev = curr
+    for (x, y), count in bigrams.items():
+        cost += count * distance(layout[x], layout[y])
     return cost
 
-def swap_chars(layout: Layout) -> Layout:
+def path_length_cost(text: str, layout: Layout) -> float:
+    """
+    Calculate total Euclidean distance traveled to type the given text using the layout.
+    The text is reduced to bigram counts first, so the per-character work
+    happens inside Counter rather than in a Python loop.
+    """
+    return bigram_cost(bigram_counts(text), layout)
+
+def pair_count_matrix(bigrams: Bigrams, keys: List[str]) -> List[List[float]]:
+    """
+    Dense symmetric matrix of bigram counts indexed by position in keys.
+    counts[i][j] holds both the (i, j) and (j, i) pairs; the diagonal stays
+    zero since repeated keys never move the finger.
+    """
+    index = {k: i for i, k in enumerate(keys)}
+    n = len(keys)
+    counts = [[0.0] * n for _ in range(n)]
+    for (x, y), count in bigrams.items():
+        i, j = index[x], index[y]
+        if i != j:
+            counts[i][j] += count
+            counts[j][i] += count
+    return counts
+
+def index_form(
+    bigrams: Bigrams, layout: Layout
+) -> Tuple[List[str], List[List[float]], List[float], List[float]]:
+    """
+    Split a layout into key order, pair count matrix and X/Y position lists.
+    """
+    keys = list(layout)
+    counts = pair_count_matrix(bigrams, keys)
+    X = [layout[k][0] for k in keys]
+    Y = [layout[k][1] for k in keys]
+    return keys, counts, X, Y
+
+def build_dist_matrix(X: List[float], Y: List[float]) -> List[List[float]]:
     """
-    Randomly swap the positions of two characters in the keyboard layout.
+    Pairwise distance matrix between all key positions.
     """
-    keys = list(layout.keys())
-    a, b = random.sample(keys, 2)
-    new_layout = layout.copy()
-    new_layout[a], new_layout[b] = new_layout[b], new_layout[a]
-    return new_layout
+    return [
+        [math.hypot(xj - xi, yj - yi) for xj, yj in zip(X, Y)]
+        for xi, yi in zip(X, Y)
+    ]
+
+def matrix_cost(counts: List[List[float]], X: List[float], Y: List[float]) -> float:
+    """
+    Total distance traveled for a symmetric count matrix and key positions.
+    """
+    cost = 0.0
+    n = len(X)
+    for i in range(n):
+        row = counts[i]
+        for j in range(i + 1, n):
+            if row[j]:
+                cost += row[j] * math.hypot(X[j] - X[i], Y[j] - Y[i])
+    return cost
 
 # --- Annealing Parameters as a dataclass ---
 
@@ -100,48 +158,161 @@ class SAParams:
     t0: float = 1.0      # Initial temperature
     alpha: float = 0.995 # Annealing (cooling) rate per epoch
     epoch: int = 50      # Steps per epoch (temp updated after each)
+    resync: int = 10000  # Steps between full cost recomputes (limits FP drift)
+    restart_patience: int = 5  # Stale windows before reheating from the best layout
+    min_accept: float = 0.01   # Accept ratio below which a window is stale
+    accept_window: int = 100   # Min steps (whole epochs) per acceptance check
 
 # --- Simulated Annealing Main Function ---
 
-def simulated_annealing(
-    text: str,
-    layout: Layout,
+def sa_kernel(
+    counts: List[List[float]],
+    X: List[float],
+    Y: List[float],
     params: SAParams,
-    rng: random.Random
-) -> Tuple[Layout, float, List[float], List[float]]:
+    seed: int
+) -> Tuple[List[float], List[float], float, List[float], List[float]]:
     """
-    Simulated annealing to optimize keyboard layout.
-    Returns (best layout, best cost, best cost trace, current cost trace)
+    Simulated annealing over key indices, with key i placed at (X[i], Y[i]).
+    Swapping keys a and b only changes the distances of pairs touching a or b,
+    so each candidate is scored in O(number of keys) from the count matrix
+    and the distance matrix D, which is permuted in place on acceptance.
+    Acceptance is measured over windows of whole epochs spanning at least
+    params.accept_window moves; if fewer than params.min_accept of a
+    window's moves are accepted for params.restart_patience windows in a
+    row, the chain restarts from the best layout at half the initial
+    temperature.
+    Returns (best X, best Y, best cost, best cost trace, current cost trace)
     """
-    current_layout = layout.copy()
-    best_layout = layout.copy()
-    current_cost = path_length_cost(text, current_layout)
+    iters, epoch, t0, alpha = params.iters, params.epoch, params.t0, params.alpha
+    resync, restart_patience = params.resync, params.restart_patience
+    min_accept, accept_window = params.min_accept, params.accept_window
+    rng = random.Random(seed)
+    # Bound once: saves a global/attribute lookup per call in the hot loop
+    _rand, _exp, _randrange = rng.random, math.exp, rng.randrange
+    n = len(X)
+    X = list(X)
+    Y = list(Y)
+    D = build_dist_matrix(X, Y)
+    current_cost = matrix_cost(counts, X, Y)
+    best_X, best_Y = X[:], Y[:]
     best_cost = current_cost
     best_costs = [best_cost]
     current_costs = [current_cost]
 
-    temp = params.t0
-
-    for it in range(params.iters):
-        for e in range(params.epoch):
-            candidate = swap_chars(current_layout)
-            candidate_cost = path_length_cost(text, candidate)
-            delta_cost = candidate_cost - current_cost
+    temp = t0
+    step = 0
+    stale = 0
+    window_moves = window_accepts = 0
+
+    for it in range(iters):
+        accepts = 0
+        for e in range(epoch):
+            # Two distinct keys without building a sample list
+            a = _randrange(n)
+            b = _randrange(n - 1)
+            b += b >= a
+            row_a, row_b = counts[a], counts[b]
+            dist_a, dist_b = D[a], D[b]
+
+            # Key a moves to b's spot and vice versa; the (a, b) pair is unchanged
+            delta_cost = 0.0
+            for j in range(n):
+                if j == a or j == b:
+                    continue
+                diff = row_a[j] - row_b[j]
+                if diff:
+                    delta_cost += diff * (dist_b[j] - dist_a[j])
 
             # Accept if better OR probabilistically worse
-            if delta_cost < 0 or rng.random() < math.exp(-delta_cost / temp):
-                current_layout = candidate
-                current_cost = candidate_cost
+            if delta_cost < 0 or _rand() < _exp(-delta_cost / temp):
+                X[a], X[b] = X[b], X[a]
+                Y[a], Y[b] = Y[b], Y[a]
+                # Swapping positions permutes rows and columns a, b of D
+                D[a], D[b] = dist_b, dist_a
+                for row in D:
+                    row[a], row[b] = row[b], row[a]
+                current_cost += delta_cost
+                accepts += 1
 
             # Track global best
             if current_cost < best_cost:
-                best_layout = current_layout.copy()
+                best_X, best_Y = X[:], Y[:]
                 best_cost = current_cost
 
+            # Periodically recompute from scratch to stop rounding error building up
+            step += 1
+            if step % resync == 0:
+                current_cost = matrix_cost(counts, X, Y)
+
             current_costs.append(current_cost)
             best_costs.append(best_cost)
-        temp *= params.alpha # Cool down after each epoch
+        temp *= alpha # Cool down after each epoch
+
+        # Reheat from the best layout once the chain has stopped moving
+        window_moves += epoch
+        window_accepts += accepts
+        if window_moves < accept_window:
+            continue
+        stale = stale + 1 if window_accepts < min_accept * window_moves else 0
+        window_moves = window_accepts = 0
+        if stale >= restart_patience:
+            X, Y = best_X[:], best_Y[:]
+            D = build_dist_matrix(X, Y)
+            current_cost = best_cost
+            temp = t0 * 0.5
+            stale = 0
+
+    return best_X, best_Y, best_cost, best_costs, current_costs
 
+def simulated_annealing(
+    text: str,
+    layout: Layout,
+    params: SAParams,
+    rng: random.Random,
+    bigrams: Optional[Bigrams] = None
+) -> Tuple[Layout, float, List[float], List[float]]:
+    """
+    Simulated annealing to optimize keyboard layout.
+    Converts the layout to index form and runs sa_kernel on it.
+    Returns (best layout, best cost, best cost trace, current cost trace)
+    """
+    if bigrams is None:
+        bigrams = bigram_counts(text)
+    keys, counts, X, Y = index_form(bigrams, layout)
+
+    best_X, best_Y, best_cost, best_costs, current_costs = sa_kernel(
+        counts, X, Y, params, rng.getrandbits(32))
+
+    best_layout = {k: (x, y) for k, x, y in zip(keys, best_X, best_Y)}
+    return best_layout, best_cost, best_costs, current_costs
+
+def run_parallel_sa(
+    text: str,
+    layout: Layout,
+    params: SAParams,
+    chains: int = 8,
+    seed: int = 0,
+    bigrams: Optional[Bigrams] = None
+) -> Tuple[Layout, float, List[float], List[float]]:
+    """
+    Run independent annealing chains (seeds seed, seed+1, ...) in separate
+    processes and keep the one with the lowest best cost.
+    Returns (best layout, best cost, best cost trace, current cost trace)
+    """
+    if bigrams is None:
+        bigrams = bigram_counts(text)
+    keys, counts, X, Y = index_form(bigrams, layout)
+
+    with ProcessPoolExecutor(max_workers=chains) as pool:
+        futures = [
+            pool.submit(sa_kernel, counts, X, Y, params, seed + c)
+            for c in range(chains)
+        ]
+        results = [f.result() for f in futures]
+
+    best_X, best_Y, best_cost, best_costs, current_costs = min(results, key=lambda r: r[2])
+    best_layout = {k: (x, y) for k, x, y in zip(keys, best_X, best_Y)}
     return best_layout, best_cost, best_costs, current_costs
 
 # --- Plotting Utilities ---
@@ -149,6 +320,11 @@ def simulated_annealing(
 def plot_costs(
     layout: Layout, best_trace: List[float], current_trace: List[float]
 ) -> None:
+    # Imported here so runs without --plot skip matplotlib's startup cost;
+    # Agg renders straight to file without loading a GUI toolkit.
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
 
     # Plot cost trace
     out_dir = "."
@@ -196,7 +372,10 @@ def plot_costs(
 
 
 def main():
-    # You can add argparse for CLI usage as needed
+    ap = argparse.ArgumentParser(description="Optimize a keyboard layout by simulated annealing.")
+    ap.add_argument("--plot", action="store_true", help="save cost trace and layout plots")
+    args = ap.parse_args()
+
     chars = string.ascii_lowercase + " "
     rng = random.Random(0)  # Fix seed for reproducibility
 
@@ -204,7 +383,8 @@ def main():
     text = "the quick brown fox jumps over the lazy dog apl is the best course ever"
     layout0 = initial_layout(chars)
     cleaned_text = preprocess_text(text, chars)
-    baseline_cost = path_length_cost(cleaned_text, layout0)
+    bigrams = bigram_counts(cleaned_text)
+    baseline_cost = bigram_cost(bigrams, layout0)
     print(f"Baseline QWERTY cost: {baseline_cost:.4f}")
 
     # Annealing parameters
@@ -213,14 +393,15 @@ def main():
     # Run simulated annealing
     start = time.time()
     best_layout, best_cost, best_trace, current_trace = simulated_annealing(
-        cleaned_text, layout0, params, rng)
+        cleaned_text, layout0, params, rng, bigrams)
     elapsed = time.time() - start
 
     print(f"Optimized cost: {best_cost:.4f} (improvement: {baseline_cost - best_cost:.4f})")
     print(f"Runtime: {elapsed:.2f}s")
 
     # Plot results
-    plot_costs(best_layout,best_trace, current_trace)
+    if args.plot:
+        plot_costs(best_layout,best_trace, current_trace)
 
 if __name__ == "__main__":
     main()
@@ -10,9 +10,30 @@ Gates: OUT = AND(A, B) | OR(A, B) | XOR(A, B) | NOT(A)
 import sys
 import argparse
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Sequence
 import re
 import json
+from collections import defaultdict
+from enum import IntEnum
+
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        out = orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+        # orjson writes non-ASCII names as raw UTF-8 where json.dumps
+        # escapes them; keep the output identical either way
+        return out if out.isascii() else json.dumps(obj, indent=2)
+except ImportError:
+    def _dumps(obj) -> str:
+        return json.dumps(obj, indent=2)
+
+
+class GateType(IntEnum):
+    AND = 0
+    OR = 1
+    XOR = 2
+    NOT = 3
 
 
 # ------------------------------------------------------------
@@ -72,7 +93,9 @@ def parse_netlist(text: str):
             raise ValueError(f"Gate {out} defined more than once")
 
         defined.add(out)
-        gates.append({"name": out, "type": typ, "inputs": args})
+        gates.append(
+            {"name": out, "type": typ, "type_code": GateType[typ], "inputs": args}
+        )
         i += 1
 
     if not gates:
@@ -114,17 +137,23 @@ def topo_sort(gates: List[dict], inputs: List[str]) -> List[Tuple[str, str]]:
 
     type_lookup = {g["name"]: g["type"] for g in gates}
 
+    # Kahn's algorithm: reverse edges + indegree counters, O(G + E)
+    consumers: Dict[str, List[str]] = defaultdict(list)
+    for g in deps:
+        for d in deps[g]:
+            consumers[d].append(g)
+    indeg = {g: len(deps[g]) for g in deps}
+
     order: List[Tuple[str, str]] = []
-    ready = [g for g in deps if not deps[g]]
+    ready = [g for g, d in indeg.items() if d == 0]
 
     while ready:
         node = ready.pop()
         order.append((node, type_lookup[node]))
-        for h in deps:
-            if node in deps[h]:
-                deps[h].remove(node)
-                if not deps[h]:
-                    ready.append(h)
+        for c in consumers[node]:
+            indeg[c] -= 1
+            if indeg[c] == 0:
+                ready.append(c)
 
     if len(order) != len(gates):
         raise ValueError("Cyclic or unresolved gate dependencies detected")
@@ -135,45 +164,87 @@ def topo_sort(gates: List[dict], inputs: List[str]) -> List[Tuple[str, str]]:
 # ------------------------------------------------------------
 # 3. Gate evaluation logic
 # ------------------------------------------------------------
-def eval_gate(typ: str, args: List[str]) -> str:
-    if typ == "NOT":
-        return "0" if args[0] == "1" else "1"
-    elif typ == "AND":
-        return "1" if args[0] == "1" and args[1] == "1" else "0"
-    elif typ == "OR":
-        return "1" if args[0] == "1" or args[1] == "1" else "0"
-    elif typ == "XOR":
-        return "1" if args[0] != args[1] else "0"
-    else:
-        raise ValueError(f"Unknown gate type: {typ}")
+# Signals are bit-packed: bit k holds the value at the k-th stimulus step,
+# so one bitwise op evaluates a gate for every time step at once.
+# GATE_EXPRS is indexed by GateType and holds each op as a source template
+# for compile_netlist; NOT only uses {a}.
+GATE_EXPRS = ("{a} & {b}", "{a} | {b}", "{a} ^ {b}", "~{a} & mask")
 
 
 # ------------------------------------------------------------
 # 4. Simulation
 # ------------------------------------------------------------
+def pack_bits(bits: Sequence[str]) -> int:
+    # "0"/"1" per time step -> int with bit k set for step k
+    return int("".join(reversed(bits)), 2) if bits else 0
+
+
+def unpack_bits(value: int, steps: int) -> str:
+    # Inverse of pack_bits, as a WaveDrom wave string
+    return format(value, f"0{steps}b")[::-1] if steps else ""
+
+
+def flatten_gates(inputs: List[str], gates: List[dict], order: List[Tuple[str, str]]):
+    # Dense signal ids (inputs first, then gates in evaluation order) and
+    # parallel per-gate arrays: type code, operand ids and output id.
+    # NOT reuses its only input as the second operand.
+    ids: Dict[str, int] = {}
+    for name in inputs:
+        ids.setdefault(name, len(ids))
+    for gname, _ in order:
+        ids[gname] = len(ids)
+
+    gate_map = {g["name"]: g for g in gates}
+    code, in0, in1, out = [], [], [], []
+    for gname, _ in order:
+        g = gate_map[gname]
+        code.append(g["type_code"])
+        in0.append(ids[g["inputs"][0]])
+        in1.append(ids[g["inputs"][-1]])
+        out.append(ids[gname])
+    return ids, code, in0, in1, out
+
+
+def compile_netlist(input_ids: List[int], result_ids: List[int], code, in0, in1, out):
+    # Generate one straight-line function for the whole netlist:
+    #   def sim(s0, s1, mask): s2 = s0 & s1; ...; return (s0, s2, ...)
+    # so evaluation has no per-gate dispatch at all.
+    params = ", ".join(f"s{i}" for i in input_ids)
+    lines = [f"def sim({params}, mask):" if params else "def sim(mask):"]
+    for c, a, b, o in zip(code, in0, in1, out):
+        lines.append(f"    s{o} = " + GATE_EXPRS[c].format(a=f"s{a}", b=f"s{b}"))
+    lines.append("    return (" + "".join(f"s{i}, " for i in result_ids) + ")")
+
+    namespace: Dict[str, object] = {}
+    exec(compile("\n".join(lines), "<netlist>", "exec"), namespace)
+    return namespace["sim"]
+
+
 def simulate(parsed_netlist):
     inputs, outputs, gates, stimuli = parsed_netlist
     order = topo_sort(gates, inputs)
+    ids, code, in0, in1, out = flatten_gates(inputs, gates, order)
+
+    input_ids = list(dict.fromkeys(ids[name] for name in inputs))
+    result_ids = [ids[name] for name in inputs + outputs]
+    sim = compile_netlist(input_ids, result_ids, code, in0, in1, out)
 
-    signals: Dict[str, str] = {}
-    waves = {s: "" for s in inputs + outputs}
+    steps = len(stimuli)
+    mask = (1 << steps) - 1
 
-    for t, values in stimuli:
-        # Set primary inputs
-        for name, val in zip(inputs, values):
-            signals[name] = val
+    # Set primary inputs for all time steps at once (stimulus transposed to columns)
+    columns = list(zip(*(values for _, values in stimuli))) or [()] * len(inputs)
+    signals = [0] * len(ids)
+    for name, column in zip(inputs, columns):
+        signals[ids[name]] = pack_bits(column)
 
-        # Evaluate gates in dependency-safe order
-        for gname, gtype in order:
-            g = next(g for g in gates if g["name"] == gname)
-            arg_vals = [signals[a] for a in g["inputs"]]
-            signals[gname] = eval_gate(gtype, arg_vals)
+    # Evaluate every gate for every time step in one call
+    results = sim(*(signals[i] for i in input_ids), mask)
 
-        # Record input/output values for this time step
-        for name in inputs:
-            waves[name] += signals[name]
-        for name in outputs:
-            waves[name] += signals[name]
+    # Record input/output values for every time step
+    waves = {}
+    for name, value in zip(inputs + outputs, results):
+        waves[name] = unpack_bits(value, steps)
 
     return waves
 
@@ -185,7 +256,7 @@ def to_wavedrom_json(inputs, outputs, waves):
     signal_list = []
     for name in inputs + outputs:
         signal_list.append({"name": name, "wave": waves[name]})
-    return json.dumps({"signal": signal_list}, indent=2)
+    return _dumps({"signal": signal_list})
 
 
 # ------------------------------------------------------------
@@ -1,13 +1,11 @@
 def convolve(A,B):
-    if len(A)<len(B):
-        A,B = B,A 
-    B=B[::-1]
-    C=[0 for i in range(len(A)+len(B)-1)]
-    for j in range(0,len(A)+len(B)-1):
-        for k in range(0,j+1):
-            b=B[-1-k] if 1 <= (1+k) <= len(B) else 0
-            a=A[j-k]  if 0 <= (j-k) <= len(A)-1 else 0
-            C[j]+=b * a
+    if not A or not B:
+        return []
+    C=[0]*(len(A)+len(B)-1)
+    for i,a in enumerate(A):
+        # every (i, j) pair lands in C[i+j], so no bounds checks are needed
+        for j,b in enumerate(B):
+            C[i+j]+=a * b
     
     return C
 print(convolve([1,2,3,4,5,6,7,8,9], [9,8,7,6,5,4,3,2,1]))
\ No newline at end of file
@@ -1,8 +1,16 @@
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+def anagram_key(word):
+    # sort the letters in the word to create a key; for long a-z words
+    # counting each letter (26 C-level str.count calls) beats sorting
+    if len(word) >= 64 and word.isascii() and word.isalpha() and word.islower():
+        return tuple(map(word.count, LETTERS))
+    return ''.join(sorted(word))
+
 def group_anagrams(words):
     groups = {}
     for word in words:
-        # sort the letters in the word to create a key
-        key = ''.join(sorted(word))
+        key = anagram_key(word)
         if key in groups:
             groups[key].append(word)
         else:
@@ -1,4 +1,374 @@
 import csv
+import json
+import math
+import mmap
+import os
+from array import array
+from collections import defaultdict
+from functools import lru_cache
+from itertools import groupby, islice
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+# ========================== DATA LOADING ==========================
+
+# Files at least this large are aggregated chunk by chunk instead of being
+# loaded whole, where the query only needs per-city totals and no column
+# cache exists yet.
+STREAM_MIN_BYTES = 512 * 1024 * 1024
+STREAM_CHUNK_ROWS = 500_000
+
+
+def _load(filename):
+    """
+    Return the parsed columns of the CSV file, reading it only once per
+    file version. The cache is keyed on the file's mtime and size so edits
+    are seen.
+    """
+    return _load_columns(*_stamp(filename))
+
+
+def _stamp(filename):
+    """Cache key for a file version: (filename, mtime in ns, size)."""
+    st = os.stat(filename)
+    return filename, st.st_mtime_ns, st.st_size
+
+
+@lru_cache(maxsize=4)
+def _load_columns(filename, mtime_ns, size):
+    """
+    Columns of the CSV, from the on-disk cache next to it when that was
+    built from this exact file version, otherwise parsed (and the cache
+    rewritten).
+    """
+    cache = filename + CACHE_SUFFIX
+    source = [mtime_ns, size]
+    data = _read_cache(cache, source)
+    if data is None:
+        data = _parse_columns(filename)
+        _write_cache(cache, data, source)
+    return _index_cities(data)
+
+
+def _parse_columns(filename):
+    """
+    Parse the CSV into columns: 'year' and 'month' (ints, -1 where that part
+    of the date is invalid) and 'temp' (floats, NaN where missing or invalid).
+    Cities are stored as integer codes: 'cities' lists names in order of
+    first appearance, 'countries' the country of each city's first row, and
+    'codes' is the per-row code; 'row_order' lists row
+    indices grouped by code, with code c at row_order[row_starts[c]:row_starts[c+1]].
+    Also precomputes per-row weighted-average terms: 'w2' (squared inverse
+    uncertainty), 'tw2' (temp * w2) and 'valid' (1 if both values are
+    present); invalid rows hold 0 so they drop out of any sum.
+    """
+    column = _read_columns(filename)
+
+    year, month = array('h'), array('b')
+    for y, m in map(_year_month, column['dt']):
+        year.append(y)
+        month.append(m)
+    temp = array('d', map(_to_float, column['AverageTemperature']))
+    unc = array('d', map(_to_float, column['AverageTemperatureUncertainty']))
+    w2, tw2, valid = _weight_terms(temp, unc)
+
+    city_code = {}
+    codes = array('i', (city_code.setdefault(c, len(city_code)) for c in column['City']))
+    cities = list(city_code)
+    # Stable sort keeps each city's rows in file order
+    row_order = array('i', sorted(range(len(codes)), key=codes.__getitem__))
+    row_starts = array('i', [0] * (len(cities) + 1))
+    for c in codes:
+        row_starts[c + 1] += 1
+    for c in range(len(cities)):
+        row_starts[c + 1] += row_starts[c]
+    country = column['Country']
+    countries = [country[row_order[row_starts[c]]] for c in range(len(cities))]
+
+    return {'year': year, 'month': month, 'temp': temp,
+            'cities': cities, 'countries': countries, 'codes': codes, 'row_order': row_order,
+            'row_starts': row_starts, 'w2': w2, 'tw2': tw2, 'valid': valid}
+
+
+def _index_cities(data):
+    """
+    Add 'city_code' (name -> code), 'city_rows' (row indices per code) and
+    'city_country' (name -> country of the city's first row).
+    """
+    order, starts = data['row_order'], data['row_starts']
+    data['city_code'] = {c: k for k, c in enumerate(data['cities'])}
+    data['city_rows'] = [order[starts[k]:starts[k + 1]] for k in range(len(data['cities']))]
+    data['city_country'] = dict(zip(data['cities'], data['countries']))
+    return data
+
+
+# The cache file is one JSON header line (the source CSV's mtime and size,
+# list columns inline, plus the typecode, length and offset of each array)
+# followed by the raw array bytes, each starting on an 8-byte boundary.
+# Arrays are read back as views over a read-only mmap of the file, so
+# processes loading the same cache share one copy in the page cache
+# instead of each holding their own.
+CACHE_SUFFIX = '.cache'
+CACHE_VERSION = 7  # bump whenever the set or meaning of cached columns changes
+
+
+def _write_cache(path, data, source):
+    """
+    Write data, parsed from the CSV version source ([mtime_ns, size]), to
+    path atomically; a read-only directory just skips caching.
+    """
+    arrays, lists, offset = [], {}, 0
+    for key, value in data.items():
+        if isinstance(value, array):
+            arrays.append([key, value.typecode, len(value), offset])
+            offset += -(-len(value) * value.itemsize // 8) * 8
+        else:
+            lists[key] = value
+    meta = {'version': CACHE_VERSION, 'source': source, 'arrays': arrays, 'lists': lists}
+    header = json.dumps(meta).encode('utf-8') + b'\n'
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'wb') as file:
+            file.write(header)
+            file.write(bytes(-len(header) % 8))
+            for key, _, _, _ in arrays:
+                raw = data[key].tobytes()
+                file.write(raw)
+                file.write(bytes(-len(raw) % 8))
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def _read_cache(path, source):
+    """
+    Data from the cache at path, or None if it is missing, unreadable or was
+    built from a CSV version other than source ([mtime_ns, size]). Arrays
+    come back as memoryviews into the mapped file.
+    """
+    try:
+        with open(path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = mapped[:mapped.find(b'\n') + 1]
+        meta = json.loads(header)
+        if meta.get('version') != CACHE_VERSION or meta.get('source') != source:
+            return None
+        start = len(header) + (-len(header) % 8)
+        view = memoryview(mapped)
+        data = dict(meta['lists'])
+        for key, typecode, length, offset in meta['arrays']:
+            begin = start + offset
+            end = begin + length * array(typecode).itemsize
+            if end > len(mapped):
+                return None
+            data[key] = view[begin:end].cast(typecode)
+        return data
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+# Columns the loaders use; any missing from a file reads as empty cells
+COLUMNS = ('dt', 'AverageTemperature', 'AverageTemperatureUncertainty', 'City', 'Country')
+
+
+def _read_columns(filename):
+    """
+    Read the CSV into {column name: sequence of cells}. Uses pyarrow's
+    multi-threaded reader when it is installed and falls back to csv if it
+    is not or cannot parse the file.
+    """
+    if pa is not None:
+        try:
+            return _fill_columns(_read_columns_arrow(filename))
+        except pa.ArrowException:
+            pass
+    with open(filename, 'r', encoding='utf-8', newline='') as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        return _fill_columns(_transpose(header, reader))
+
+
+def _fill_columns(column):
+    """Add any of COLUMNS missing from column as all-empty cells."""
+    rows = max(map(len, column.values()), default=0)
+    for name in COLUMNS:
+        column.setdefault(name, ('',) * rows)
+    return column
+
+
+def _transpose(header, rows):
+    """
+    {column name: tuple of cells} for csv rows, transposed in C instead of
+    building a dict per row. Blank lines are skipped; short rows are padded
+    with empty cells and extra cells dropped, so one ragged row cannot cut
+    every column down to its length.
+    """
+    width = len(header)
+    rows = [row if len(row) == width else (row + [''] * width)[:width]
+            for row in rows if row]
+    columns = list(zip(*rows)) or [()] * width
+    return dict(zip(header, columns))
+
+
+def _read_columns_arrow(filename):
+    """
+    pyarrow reader: parses blocks of the file in parallel threads.
+    Missing numbers come back as None; dates and names stay strings.
+    Only those of COLUMNS present in the header are read, as with csv.
+    """
+    with open(filename, 'r', encoding='utf-8', newline='') as file:
+        header = next(csv.reader(file), [])
+    types = {'AverageTemperature': pa.float64(), 'AverageTemperatureUncertainty': pa.float64()}
+    column_types = {name: types.get(name, pa.string()) for name in COLUMNS if name in header}
+    table = pa_csv.read_csv(
+        filename,
+        read_options=pa_csv.ReadOptions(use_threads=True, block_size=32 << 20),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=column_types, include_columns=list(column_types)),
+    )
+    return {name: table.column(name).to_pylist() for name in column_types}
+
+
+def _weight_terms(temp, unc):
+    """
+    Per-row weighted-average terms (w2, tw2, valid) for temperature and
+    uncertainty columns; rows missing either value get zeros.
+    """
+    w2, tw2, valid = array('d'), array('d'), array('B')
+    for t, u in zip(temp, unc):
+        if math.isnan(t) or math.isnan(u):
+            w2.append(0.0)
+            tw2.append(0.0)
+            valid.append(0)
+        else:
+            # Zero uncertainty counts as 1.0 (0.0 and -0.0 are falsy)
+            w = (1.0 / (u or 1.0)) ** 2
+            w2.append(w)
+            tw2.append(t * w)
+            valid.append(1)
+    return w2, tw2, valid
+
+
+def _year_month(dt):
+    """
+    (year, month) from a 'YYYY-MM-DD' date, each parsed on its own and -1
+    if invalid, so a bare 'YYYY' still has its year.
+    """
+    return _to_int(dt[:4]), _to_int(dt[5:7])
+
+
+def _to_int(text):
+    """int(text), or -1 if it is not a number."""
+    try:
+        return int(text)
+    except ValueError:
+        return -1
+
+
+def _date_key(year, month):
+    """'YYYY-MM' key used in the API results ('YYYY' if the month is invalid)."""
+    if month < 0:
+        return f"{year:04d}"
+    return f"{year:04d}-{month:02d}"
+
+
+def _to_float(text):
+    """float(text), or NaN if the cell is empty, missing or not a number."""
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _temperature_rows(data, rows):
+    """The given rows that have a temperature and a valid year."""
+    temp, year = data['temp'], data['year']
+    return [i for i in rows if year[i] >= 0 and not math.isnan(temp[i])]
+
+
+def _city_rows(data, city_name):
+    """Row indices belonging to a city, in file order (empty if unknown)."""
+    code = data['city_code'].get(city_name)
+    return data['city_rows'][code] if code is not None else ()
+
+
+def _weighted_avg(data, rows):
+    """
+    Weighted average of temperatures over the given rows, using uncertainty
+    as weight. Returns (num, den, count) over rows with both values present.
+    """
+    num = sum(map(data['tw2'].__getitem__, rows))
+    den = sum(map(data['w2'].__getitem__, rows))
+    count = sum(map(data['valid'].__getitem__, rows))
+    return num, den, count
+
+
+def _accumulate_cities(table, city, country, tw2, w2):
+    """Add rows' weighted sums into table {city: [num, den, first country]}."""
+    for c, co, t, w in zip(city, country, tw2, w2):
+        entry = table.get(c)
+        if entry is None:
+            table[c] = [t, w, co]
+        else:
+            entry[0] += t
+            entry[1] += w
+
+
+def _city_averages(data):
+    """
+    Weighted-average sums for every city in one pass over the rows.
+    Returns {city: (num, den, country)} with country from the city's first row.
+    """
+    table = {}
+    city = map(data['cities'].__getitem__, data['codes'])
+    country = map(data['countries'].__getitem__, data['codes'])
+    _accumulate_cities(table, city, country, data['tw2'], data['w2'])
+    return {city: tuple(entry) for city, entry in table.items()}
+
+
+@lru_cache(maxsize=8)
+def _city_weighted_avg_table(stamp):
+    """
+    Per-city weighted-average sums {city: (num, den, country)} for a file
+    version from _stamp(), built once and shared by every city query.
+    Large files are streamed unless a valid on-disk cache already holds
+    their columns (mapping it is cheaper than any reparse).
+    """
+    filename, mtime_ns, size = stamp
+    if (size >= STREAM_MIN_BYTES
+            and _read_cache(filename + CACHE_SUFFIX, [mtime_ns, size]) is None):
+        return _city_averages_streaming(filename)
+    return _city_averages(_load_columns(*stamp))
+
+
+def _city_averages_streaming(filename, chunksize=STREAM_CHUNK_ROWS):
+    """
+    Same result as _city_averages(_load(filename)), but reads the CSV
+    chunksize rows at a time and keeps only the per-city sums, so memory
+    stays bounded by one chunk instead of the whole file.
+    """
+    table = {}
+    with open(filename, 'r', encoding='utf-8', newline='') as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        while True:
+            rows = list(islice(reader, chunksize))
+            if not rows:
+                break
+            column = _fill_columns(_transpose(header, rows))
+            temp = array('d', map(_to_float, column['AverageTemperature']))
+            unc = array('d', map(_to_float, column['AverageTemperatureUncertainty']))
+            w2, tw2, _ = _weight_terms(temp, unc)
+            _accumulate_cities(table, column['City'], column['Country'], tw2, w2)
+    return {city: tuple(entry) for city, entry in table.items()}
+
 
 # ========================== BASIC UTILITIES ==========================
 
@@ -7,44 +377,32 @@ def get_city_temperatures(filename, city_name):
     Extract temperature data for a specific city from CSV file.
     Returns dict: {'YYYY-MM': temperature}.
     """
+    data = _load(filename)
+    year, month, temp = data['year'], data['month'], data['temp']
     temperature_data = {}
-    with open(filename, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            if row['City'] == city_name and row['AverageTemperature']:
-                try:
-                    year_month = row['dt'][:7]  # YYYY-MM
-                    temperature_data[year_month] = float(row['AverageTemperature'])
-                except ValueError:
-                    continue
+    for i in _temperature_rows(data, _city_rows(data, city_name)):
+        temperature_data[_date_key(year[i], month[i])] = temp[i]
     return temperature_data
 
 
 def get_available_cities(filename, limit=None):
     """Return sorted list of unique city names."""
-    cities = set()
-    with open(filename, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            cities.add(row['City'])
-            if limit and len(cities) >= limit:
-                break
-    return sorted(cities)
+    cities = _load(filename)['cities']  # in order of first appearance
+    return sorted(cities[:limit] if limit else cities)
 
 
 def get_available_years(filename, limit=None):
     """Return sorted list of available years (as integers)."""
+    year_column = _load(filename)['year']
+    if not limit:
+        return sorted(set(year_column) - {-1})
     years = set()
-    with open(filename, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            try:
-                year = int(row['dt'][:4])
-                years.add(year)
-            except ValueError:
-                continue
-            if limit and len(years) >= limit:
-                break
+    for year in year_column:
+        if year < 0:
+            continue
+        years.add(year)
+        if len(years) >= limit:
+            break
     return sorted(years)
 
 
@@ -52,81 +410,75 @@ def avg_temperature_with_uncertainty(filename, city_name):
     """
     Weighted average of temperatures for a city, using uncertainty as weight.
     """
-    num, den = 0.0, 0.0
-    with open(filename, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            if row['City'] == city_name and row['AverageTemperature']:
-                try:
-                    temp = float(row['AverageTemperature'])
-                    unc = float(row['AverageTemperatureUncertainty'])
-                    weight = 1.0 / (unc if unc != 0 else 1.0)
-                    num += temp * (weight ** 2)
-                    den += weight ** 2
-                except ValueError:
-                    continue
+    table = _city_weighted_avg_table(_stamp(filename))
+    num, den, _ = table.get(city_name, (0.0, 0.0, None))
     if den == 0:
         raise ValueError(f"No valid data found for city '{city_name}'")
     return num / den
 
 
+def bulk_city_stats(filename, cities):
+    """
+    Weighted average temperature for each of several cities, as
+    {city: average}; cities with no valid data map to None.
+    """
+    table = _city_weighted_avg_table(_stamp(filename))
+    stats = {}
+    for city in cities:
+        num, den, _ = table.get(city, (0.0, 0.0, None))
+        stats[city] = num / den if den != 0 else None
+    return stats
+
+
 def country_name(filename, city_name):
     """Return the country name for a given city."""
-    with open(filename, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            if row['City'] == city_name:
-                return row['Country']
-    raise ValueError(f"City '{city_name}' not found in dataset")
+    country = _load(filename)['city_country'].get(city_name)
+    if country is None:
+        raise ValueError(f"City '{city_name}' not found in dataset")
+    return country
 
 
 # ========================== API FUNCTIONS ==========================
 
 def find_temperature_extremes(filename, city_name):
     """Find the hottest and coldest months on record for a city."""
-    date_temp = {}
-    with open(filename, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            if row['City'] == city_name and row['AverageTemperature']:
-                date_temp[row['dt'][:7]] = float(row['AverageTemperature'])
-
-    if not date_temp:
+    data = _load(filename)
+    year, month, temp = data['year'], data['month'], data['temp']
+    rows = _temperature_rows(data, _city_rows(data, city_name))
+
+    if not rows:
         raise ValueError(f"City '{city_name}' not found or has no data")
 
-    min_key = min(date_temp, key=date_temp.get)
-    max_key = max(date_temp, key=date_temp.get)
+    # A later row for the same month replaces an earlier one (as in
+    # get_city_temperatures); months keep the order they first appear in,
+    # so ties still go to the earliest month
+    last = {}
+    for i in rows:
+        last[year[i], month[i]] = i
+    i_min = min(last.values(), key=temp.__getitem__)
+    i_max = max(last.values(), key=temp.__getitem__)
     return {
-        'hottest': {'date': max_key, 'temperature': date_temp[max_key]},
-        'coldest': {'date': min_key, 'temperature': date_temp[min_key]}
+        'hottest': {'date': _date_key(year[i_max], month[i_max]), 'temperature': temp[i_max]},
+        'coldest': {'date': _date_key(year[i_min], month[i_min]), 'temperature': temp[i_min]}
     }
 
 
 def get_seasonal_averages(filename, city_name, season):
     """Compute weighted average temperature for a given season."""
     seasons = {
-        'spring': ['03', '04', '05'],
-        'summer': ['06', '07', '08'],
-        'fall':   ['09', '10', '11'],
-        'winter': ['12', '01', '02']
+        'spring': {3, 4, 5},
+        'summer': {6, 7, 8},
+        'fall':   {9, 10, 11},
+        'winter': {12, 1, 2}
     }
     if season not in seasons:
         raise ValueError("Season must be one of: spring, summer, fall, winter")
 
     months = seasons[season]
-    num, den = 0.0, 0.0
-    with open(filename, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            if row['City'] == city_name and row['dt'][5:7] in months and row['AverageTemperature']:
-                try:
-                    temp = float(row['AverageTemperature'])
-                    unc = float(row['AverageTemperatureUncertainty'])
-                    weight = 1.0 / (unc if unc != 0 else 1.0)
-                    num += temp * (weight ** 2)
-                    den += weight ** 2
-                except ValueError:
-                    continue
+    data = _load(filename)
+    month = data['month']
+    rows = [i for i in _city_rows(data, city_name) if month[i] in months]
+    num, den, _ = _weighted_avg(data, rows)
 
     if den == 0:
         raise ValueError(f"No data found for city '{city_name}' in season '{season}'")
@@ -139,23 +491,13 @@ def get_seasonal_averages(filename, city_name, season):
 
 def compare_decades(filename, city_name, decade1, decade2):
     """Compare average temperatures between two decades."""
+    data = _load(filename)
+    year = data['year']
+    city_rows = _temperature_rows(data, _city_rows(data, city_name))
+
     def avg_for_decade(decade):
-        num, den, count = 0.0, 0.0, 0
-        with open(filename, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                if row['City'] == city_name and row['AverageTemperature']:
-                    year = int(row['dt'][:4])
-                    if year // 10 * 10 == decade:
-                        try:
-                            temp = float(row['AverageTemperature'])
-                            unc = float(row['AverageTemperatureUncertainty'])
-                            weight = 1.0 / (unc if unc != 0 else 1.0)
-                            num += temp * (weight ** 2)
-                            den += weight ** 2
-                            count += 1
-                        except ValueError:
-                            continue
+        rows = [i for i in city_rows if year[i] // 10 * 10 == decade]
+        num, den, count = _weighted_avg(data, rows)
         if den == 0:
             raise ValueError(f"No data for {city_name} in {decade}s")
         return num / den, count
@@ -177,21 +519,26 @@ def compare_decades(filename, city_name, decade1, decade2):
 
 def find_similar_cities(filename, target_city, tolerance=2.0):
     """Find cities with similar average temps within tolerance."""
-    target_temp = avg_temperature_with_uncertainty(filename, target_city)
+    averages = _city_weighted_avg_table(_stamp(filename))
+    num, den, _ = averages.get(target_city, (0.0, 0.0, None))
+    if den == 0:
+        raise ValueError(f"No valid data found for city '{target_city}'")
+    target_temp = num / den
+
     similar = []
-    for city in get_available_cities(filename):
-        try:
-            temp = avg_temperature_with_uncertainty(filename, city)
-            diff = abs(target_temp - temp)
-            if diff <= tolerance and city != target_city:
-                similar.append({
-                    'city': city,
-                    'country': country_name(filename, city),
-                    'avg_temp': temp,
-                    'difference': diff
-                })
-        except ValueError:
+    for city in sorted(averages):
+        num, den, country = averages[city]
+        if den == 0:
             continue
+        temp = num / den
+        diff = abs(target_temp - temp)
+        if diff <= tolerance and city != target_city:
+            similar.append({
+                'city': city,
+                'country': country,
+                'avg_temp': temp,
+                'difference': diff
+            })
 
     return {
         'target_city': target_city,
@@ -203,15 +550,16 @@ def find_similar_cities(filename, target_city, tolerance=2.0):
 
 def get_temperature_trends(filename, city_name, window_size=5):
     """Calculate annual averages, moving averages, and warming/cooling trends."""
-    years = get_available_years(filename)
     city_data = get_city_temperatures(filename, city_name)
 
     # ---- Annual averages ----
-    annual = {}
-    for y in years:
-        vals = [v for k, v in city_data.items() if int(k[:4]) == y]
-        if vals:
-            annual[y] = sum(vals) / len(vals)
+    # One pass over the months, accumulating per year in record order
+    sums, counts = defaultdict(float), defaultdict(int)
+    for k, v in city_data.items():
+        y = int(k[:4])
+        sums[y] += v
+        counts[y] += 1
+    annual = {y: sums[y] / counts[y] for y in sorted(sums)}
 
     yrs = list(annual.keys())
     temps = list(annual.values())
@@ -229,27 +577,19 @@ def get_temperature_trends(filename, city_name, window_size=5):
         slope = (temps[-1] - temps[0]) / (yrs[-1] - yrs[0])
 
     # ---- Warming/cooling streaks ----
+    # Maximal runs of same-sign year-to-year change; a run over changes
+    # i..j spans years i..j+1, and consecutive runs share an endpoint.
     warming, cooling = [], []
-    i = 0
-    while i < len(temps) - 1:
-        if temps[i+1] > temps[i]:
-            start = i
-            while i+1 < len(temps) and temps[i+1] > temps[i]:
-                i += 1
-            end = i
-            year_diff = yrs[end] - yrs[start]
-            rate = (temps[end] - temps[start]) / year_diff if year_diff else 0.0
-            warming.append({'start': yrs[start], 'end': yrs[end], 'rate': rate})
-        elif temps[i+1] < temps[i]:
-            start = i
-            while i+1 < len(temps) and temps[i+1] < temps[i]:
-                i += 1
-            end = i
+    changes = [(b > a) - (b < a) for a, b in zip(temps, temps[1:])]
+    start = 0
+    for sign, run in groupby(changes):
+        end = start + sum(1 for _ in run)
+        if sign:
             year_diff = yrs[end] - yrs[start]
-            rate = (temps[start] - temps[end]) / year_diff if year_diff else 0.0
-            cooling.append({'start': yrs[start], 'end': yrs[end], 'rate': rate})
-        else:
-            i += 1
+            rate = sign * (temps[end] - temps[start]) / year_diff if year_diff else 0.0
+            streaks = warming if sign > 0 else cooling
+            streaks.append({'start': yrs[start], 'end': yrs[end], 'rate': rate})
+        start = end
 
     return {
         'city': city_name,
@@ -275,16 +615,6 @@ def test_api_functions():
     print("Testing Temperature Data API")
     print("=" * 40)
 
-    
-    """
-    Test all API functions with sample data.
-    """
-    filename = 'GlobalLandTemperaturesByMajorCity.csv'
-    test_city = 'Madras'
-
-    print("Testing Temperature Data API")
-    print("=" * 40)
-
     #Test basic function
     temps = get_city_temperatures(filename, test_city)
     print(f"Basic function: Found {len(temps)} temperature records")